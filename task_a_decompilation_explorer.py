@@ -8,12 +8,308 @@ This script explores how "announcements" might work in Claude Code by:
 3. Identifying potential announcement injection points
 """
 
+import asyncio
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, is_dataclass
 from pathlib import Path
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Tuple
 from datetime import datetime
 
+# orjson serializes natively; fall back to the stdlib encoder without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# google-re2 matches in linear time; the stdlib engine is a drop-in fallback
+try:
+    import re2 as _regex
+except ImportError:
+    import re as _regex
+
+
+# Reports are written here; created once at import rather than per save
+_OUTPUT_DIR = Path("analysis_results")
+_OUTPUT_DIR.mkdir(exist_ok=True)
+
+
+# All announcement indicators as one alternation, so captured responses are
+# scanned in a single pass regardless of how many indicators there are
+_ANNOUNCEMENT_RE = _regex.compile(
+    r"(?i)announcement|important notice|system message|\*\*\*.*\*\*\*|===.*==="
+)
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert the frozen records held in analysis results for JSON output."""
+    if is_dataclass(obj):
+        return asdict(obj)
+    return dict(obj)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj as indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, default=_json_default).encode()
+
+
+def scan_response(text: str) -> List[str]:
+    """Return every announcement indicator matched in text."""
+    return _ANNOUNCEMENT_RE.findall(text)
+
+
+# The template is static, so it is built once at import time and shared
+_MONKEY_PATCH_TEMPLATE = '''
+// Monkey Patch Template for Announcement Detection
+// Based on claude-code-reverse methodology
+
+// Step 1: Locate the beta.messages.create method
+// In cli.js (after js-beautify):
+// Find: beta.messages.create or similar API call
+
+// Step 2: Detection regex, compiled once at module load
+// All indicators are unioned so each response is scanned in a single pass
+const ANNOUNCEMENT_RE = /(announcement|important notice|system message|\*\*\*.*\*\*\*|===.*===)/i;
+
+// Pretty-printing is only worth its cost when debugging the patch itself
+const DEBUG = false;
+const serialize = (value) => DEBUG ? JSON.stringify(value, null, 2) : JSON.stringify(value);
+
+// Buffered, asynchronous logging: entries are queued in memory and
+// appended in batches so no disk write sits on the API call path
+const fs = require('fs');
+const LOG_BUFS = new Map();
+const FLUSH_BYTES = 64 * 1024;
+const FLUSH_MS = 50;
+let bufferedBytes = 0;
+let pending = null;
+
+// payload is already-serialized JSON and is spliced into the entry as is,
+// so it is never stringified (and escaped) a second time
+function logToFile(path, timestamp, type, key, payload) {
+    const line = '{"timestamp":' + JSON.stringify(timestamp) + ',"type":"' + type
+        + '","' + key + '":' + payload + '}\\n';
+    if (!LOG_BUFS.has(path)) LOG_BUFS.set(path, []);
+    LOG_BUFS.get(path).push(line);
+    bufferedBytes += line.length;
+    if (bufferedBytes >= FLUSH_BYTES) {
+        flushLogs();
+    } else if (!pending) {
+        pending = setTimeout(flushLogs, FLUSH_MS);
+    }
+}
+
+async function flushLogs() {
+    if (pending) {
+        clearTimeout(pending);
+        pending = null;
+    }
+    const batches = [...LOG_BUFS.entries()];
+    LOG_BUFS.clear();
+    bufferedBytes = 0;
+    // A failed write (EACCES, ENOSPC, ...) drops that batch; it must never
+    // surface as an unhandled rejection, which would kill the host process
+    await Promise.all(batches.map(
+        ([path, lines]) => fs.promises.appendFile(path, lines.join('')).catch(logWriteFailed)
+    ));
+}
+
+let logWriteReported = false;
+function logWriteFailed(err) {
+    if (!logWriteReported) {
+        logWriteReported = true;
+        console.error('[announcement-patch] log write failed, dropping entries:', err.message);
+    }
+}
+
+process.on('beforeExit', flushLogs);
+
+// Step 3: Wrap the method to intercept requests/responses
+const originalCreate = beta.messages.create;
+beta.messages.create = async function(...args) {
+    const timestamp = new Date().toISOString();
+    
+    // Log request; serialization is deferred until the call is dispatched
+    const snapshot = args;
+    queueMicrotask(() => logToFile(
+        'announcement_detection.log', timestamp, 'request', 'args', serialize(snapshot)
+    ));
+    
+    // Call original method
+    const response = await originalCreate.apply(this, args);
+    
+    // Streaming responses are scanned event-by-event as they are consumed,
+    // never drained or serialized up front
+    if (response && typeof response[Symbol.asyncIterator] === 'function') {
+        return teeStream(response, timestamp);
+    }
+    
+    // Log and scan the response after it has been handed back to the caller
+    queueMicrotask(() => {
+        // Serialize once and share it between logging and detection
+        const isObject = response !== null && typeof response === 'object';
+        const serialized = isObject ? serialize(response) : String(response);
+        logToFile('announcement_detection.log', timestamp, 'response', 'data',
+            isObject ? serialized : JSON.stringify(serialized));
+        checkForAnnouncements(serialized);
+    });
+    
+    return response;
+};
+
+// Step 4: Pass-through scanner for streamed responses
+async function* teeStream(stream, timestamp) {
+    for await (const event of stream) {
+        const serialized = serialize(event);
+        logToFile('announcement_detection.log', timestamp, 'response_event', 'data', serialized);
+        checkForAnnouncements(serialized);
+        yield event;
+    }
+}
+
+// Step 5: Detection logic
+// Cheap substring checks reject the common no-marker case before the regex
+const KEYWORD_RE = /announcement|important notice|system message/i;
+function hasMarker(content) {
+    return content.indexOf('***') >= 0
+        || content.indexOf('===') >= 0
+        || KEYWORD_RE.test(content);
+}
+
+function checkForAnnouncements(content) {
+    if (!hasMarker(content)) return;
+    const m = ANNOUNCEMENT_RE.exec(content);
+    if (m) {
+        console.log('[ANNOUNCEMENT DETECTED]', m[0]);
+    }
+}
+'''
+
+
+@dataclass(slots=True, frozen=True)
+class Mechanism:
+    """Represents a candidate announcement delivery mechanism."""
+    name: str
+    likelihood: str  # 'HIGH', 'MEDIUM', 'LOW'
+    description: str
+    evidence: Tuple[str, ...]
+    injection_points: Tuple[str, ...]
+    detection_method: str
+
+
+# Mechanism and pattern data is static, so it is evaluated once at import
+# time and shared read-only across analyzer instances
+_MECHANISMS = (
+    Mechanism(
+        name="System Prompt Injection",
+        likelihood="HIGH",
+        description="Announcements injected into system prompts",
+        evidence=(
+            "system-reminder-start.prompt.md dynamically loads environment info",
+            "system-workflow.prompt.md defines core agent behavior",
+            "These prompts are loaded before each interaction"
+        ),
+        injection_points=(
+            "system_reminder_start",
+            "system_reminder_end",
+            "system_workflow"
+        ),
+        detection_method="Monitor API calls for unexpected prompt additions"
+    ),
+    Mechanism(
+        name="API Response Modification",
+        likelihood="MEDIUM",
+        description="Announcements added to API responses post-processing",
+        evidence=(
+            "beta.messages.create is the main API endpoint",
+            "Responses are processed before display",
+            "Monkey-patching shows this is a central interception point"
+        ),
+        injection_points=(
+            "beta_messages_create_response",
+            "response_stream_processing",
+            "message_content_blocks"
+        ),
+        detection_method="Compare raw API response with displayed output"
+    ),
+    Mechanism(
+        name="Tool Result Injection",
+        likelihood="LOW",
+        description="Announcements disguised as tool results",
+        evidence=(
+            "Tools are consistently loaded in core workflow",
+            "Todo tool manages short-term memory",
+            "Custom tools can inject arbitrary content"
+        ),
+        injection_points=(
+            "tool_result_blocks",
+            "mcp_server_responses",
+            "todo_tool_output"
+        ),
+        detection_method="Track tool calls and verify expected results"
+    ),
+    Mechanism(
+        name="Context Compaction Injection",
+        likelihood="MEDIUM",
+        description="Announcements added during context compression",
+        evidence=(
+            "Context compaction uses system-compact.prompt.md",
+            "Compaction creates a single text block for next conversation",
+            "This is triggered manually or automatically"
+        ),
+        injection_points=(
+            "system_compact_prompt",
+            "compact_prompt_end",
+            "compressed_context_output"
+        ),
+        detection_method="Compare pre and post compaction content"
+    ),
+    Mechanism(
+        name="IDE Integration Channel",
+        likelihood="HIGH",
+        description="Announcements through IDE-specific communication",
+        evidence=(
+            "IDE integration reads open files",
+            "IDE tools registered through MCP",
+            "ide-opened-file.prompt.md provides context"
+        ),
+        injection_points=(
+            "ide_opened_file_prompt",
+            "ide_mcp_tools",
+            "vscode_extension_channel"
+        ),
+        detection_method="Monitor IDE extension communication"
+    ),
+)
+
+_PATTERNS = (
+    MappingProxyType({
+        "pattern": "Unexpected UserMessage in conversation",
+        "indicator": "Message not from user input",
+        "check": "Compare message history with user input log"
+    }),
+    MappingProxyType({
+        "pattern": "System prompt with dynamic timestamp",
+        "indicator": "Time-sensitive content injection",
+        "check": "Look for date/time references in system prompts"
+    }),
+    MappingProxyType({
+        "pattern": "Additional text before assistant response",
+        "indicator": "Prepended announcement text",
+        "check": "Parse message content blocks for injected text"
+    }),
+    MappingProxyType({
+        "pattern": "Special formatting or markers",
+        "indicator": "Banner-like text formatting",
+        "check": "Regex search for '===', '***', or similar patterns"
+    }),
+)
+
 
 class AnnouncementMechanismAnalyzer:
     """
@@ -21,162 +317,78 @@ class AnnouncementMechanismAnalyzer:
     techniques from the claude-code-reverse repository.
     """
     
+    __slots__ = ("analysis_results", "_run_stamp")
+    
     def __init__(self):
+        self._run_stamp = datetime.now()
         self.analysis_results = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._run_stamp.isoformat(),
             "mechanisms": [],
             "injection_points": [],
             "patterns": []
         }
     
-    def analyze_system_prompt_injection(self) -> Dict[str, Any]:
+    async def analyze_system_prompt_injection(self) -> Mechanism:
         """
         Based on claude-code-reverse findings, system prompts are dynamically
         loaded at various points. Announcements could be injected here.
         """
-        mechanism = {
-            "name": "System Prompt Injection",
-            "likelihood": "HIGH",
-            "description": "Announcements injected into system prompts",
-            "evidence": [
-                "system-reminder-start.prompt.md dynamically loads environment info",
-                "system-workflow.prompt.md defines core agent behavior",
-                "These prompts are loaded before each interaction"
-            ],
-            "injection_points": [
-                "system_reminder_start",
-                "system_reminder_end",
-                "system_workflow"
-            ],
-            "detection_method": "Monitor API calls for unexpected prompt additions"
-        }
-        
-        self.analysis_results["mechanisms"].append(mechanism)
-        return mechanism
+        return _MECHANISMS[0]
     
-    def analyze_api_response_injection(self) -> Dict[str, Any]:
+    async def analyze_api_response_injection(self) -> Mechanism:
         """
         Analyzes the possibility of announcements being injected in API responses
         before they reach the user interface.
         """
-        mechanism = {
-            "name": "API Response Modification",
-            "likelihood": "MEDIUM",
-            "description": "Announcements added to API responses post-processing",
-            "evidence": [
-                "beta.messages.create is the main API endpoint",
-                "Responses are processed before display",
-                "Monkey-patching shows this is a central interception point"
-            ],
-            "injection_points": [
-                "beta_messages_create_response",
-                "response_stream_processing",
-                "message_content_blocks"
-            ],
-            "detection_method": "Compare raw API response with displayed output"
-        }
-        
-        self.analysis_results["mechanisms"].append(mechanism)
-        return mechanism
+        return _MECHANISMS[1]
     
-    def analyze_tool_result_injection(self) -> Dict[str, Any]:
+    async def analyze_tool_result_injection(self) -> Mechanism:
         """
         Analyzes if announcements could be delivered through tool results.
         """
-        mechanism = {
-            "name": "Tool Result Injection",
-            "likelihood": "LOW",
-            "description": "Announcements disguised as tool results",
-            "evidence": [
-                "Tools are consistently loaded in core workflow",
-                "Todo tool manages short-term memory",
-                "Custom tools can inject arbitrary content"
-            ],
-            "injection_points": [
-                "tool_result_blocks",
-                "mcp_server_responses",
-                "todo_tool_output"
-            ],
-            "detection_method": "Track tool calls and verify expected results"
-        }
-        
-        self.analysis_results["mechanisms"].append(mechanism)
-        return mechanism
+        return _MECHANISMS[2]
     
-    def analyze_context_compaction_injection(self) -> Dict[str, Any]:
+    async def analyze_context_compaction_injection(self) -> Mechanism:
         """
         Analyzes if announcements are injected during context compaction.
         """
-        mechanism = {
-            "name": "Context Compaction Injection",
-            "likelihood": "MEDIUM",
-            "description": "Announcements added during context compression",
-            "evidence": [
-                "Context compaction uses system-compact.prompt.md",
-                "Compaction creates a single text block for next conversation",
-                "This is triggered manually or automatically"
-            ],
-            "injection_points": [
-                "system_compact_prompt",
-                "compact_prompt_end",
-                "compressed_context_output"
-            ],
-            "detection_method": "Compare pre and post compaction content"
-        }
-        
-        self.analysis_results["mechanisms"].append(mechanism)
-        return mechanism
+        return _MECHANISMS[3]
     
-    def analyze_ide_integration_injection(self) -> Dict[str, Any]:
+    async def analyze_ide_integration_injection(self) -> Mechanism:
         """
         Analyzes if announcements are delivered through IDE integration features.
         """
-        mechanism = {
-            "name": "IDE Integration Channel",
-            "likelihood": "HIGH",
-            "description": "Announcements through IDE-specific communication",
-            "evidence": [
-                "IDE integration reads open files",
-                "IDE tools registered through MCP",
-                "ide-opened-file.prompt.md provides context"
-            ],
-            "injection_points": [
-                "ide_opened_file_prompt",
-                "ide_mcp_tools",
-                "vscode_extension_channel"
-            ],
-            "detection_method": "Monitor IDE extension communication"
-        }
+        return _MECHANISMS[4]
+    
+    async def analyze_all_mechanisms(self) -> List[Mechanism]:
+        """
+        Run every mechanism analyzer concurrently. The analyzers are
+        independent, so any I/O they perform overlaps.
+        """
+        return list(await asyncio.gather(
+            self.analyze_system_prompt_injection(),
+            self.analyze_api_response_injection(),
+            self.analyze_tool_result_injection(),
+            self.analyze_context_compaction_injection(),
+            self.analyze_ide_integration_injection()
+        ))
+    
+    def _run_analyzers(self) -> List[Mechanism]:
+        """Drive analyze_all_mechanisms from synchronous code."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.analyze_all_mechanisms())
         
-        self.analysis_results["mechanisms"].append(mechanism)
-        return mechanism
+        # Already inside an event loop: run on a private loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.analyze_all_mechanisms()).result()
     
-    def identify_announcement_patterns(self) -> List[Dict[str, Any]]:
+    def identify_announcement_patterns(self) -> List[Mapping[str, Any]]:
         """
         Based on the analysis, identify patterns that could indicate announcements.
         """
-        patterns = [
-            {
-                "pattern": "Unexpected UserMessage in conversation",
-                "indicator": "Message not from user input",
-                "check": "Compare message history with user input log"
-            },
-            {
-                "pattern": "System prompt with dynamic timestamp",
-                "indicator": "Time-sensitive content injection",
-                "check": "Look for date/time references in system prompts"
-            },
-            {
-                "pattern": "Additional text before assistant response",
-                "indicator": "Prepended announcement text",
-                "check": "Parse message content blocks for injected text"
-            },
-            {
-                "pattern": "Special formatting or markers",
-                "indicator": "Banner-like text formatting",
-                "check": "Regex search for '===', '***', or similar patterns"
-            }
-        ]
+        patterns = list(_PATTERNS)
         
         self.analysis_results["patterns"] = patterns
         return patterns
@@ -186,111 +398,64 @@ class AnnouncementMechanismAnalyzer:
         Generate a template for monkey-patching to detect announcements.
         Based on cli.js.patch approach from claude-code-reverse.
         """
-        template = '''
-// Monkey Patch Template for Announcement Detection
-// Based on claude-code-reverse methodology
-
-// Step 1: Locate the beta.messages.create method
-// In cli.js (after js-beautify):
-// Find: beta.messages.create or similar API call
-
-// Step 2: Wrap the method to intercept requests/responses
-const originalCreate = beta.messages.create;
-beta.messages.create = async function(...args) {
-    const timestamp = new Date().toISOString();
-    
-    // Log request
-    const request = {
-        timestamp: timestamp,
-        type: 'request',
-        args: JSON.stringify(args, null, 2)
-    };
-    logToFile('announcement_detection.log', request);
-    
-    // Call original method
-    const response = await originalCreate.apply(this, args);
-    
-    // Log response
-    const responseLog = {
-        timestamp: timestamp,
-        type: 'response',
-        data: JSON.stringify(response, null, 2)
-    };
-    logToFile('announcement_detection.log', responseLog);
-    
-    // Check for announcement indicators
-    checkForAnnouncements(response);
-    
-    return response;
-};
-
-// Step 3: Detection logic
-function checkForAnnouncements(response) {
-    // Check for unexpected content in response
-    const indicators = [
-        /announcement/i,
-        /important notice/i,
-        /system message/i,
-        /\*\*\*.*\*\*\*/,  // Banner-like formatting
-        /===.*===/
-    ];
-    
-    const content = JSON.stringify(response);
-    indicators.forEach(indicator => {
-        if (indicator.test(content)) {
-            console.log('[ANNOUNCEMENT DETECTED]', indicator);
-        }
-    });
-}
-'''
-        return template
+        return _MONKEY_PATCH_TEMPLATE
     
     def run_full_analysis(self) -> Dict[str, Any]:
         """
         Run complete analysis of announcement mechanisms.
         """
-        print("=" * 70)
-        print("ANNOUNCEMENT MECHANISM ANALYSIS")
-        print("Based on claude-code-reverse decompilation techniques")
-        print("=" * 70)
-        print()
+        # One clock read per run, shared by the report and its filename
+        self._run_stamp = datetime.now()
+        self.analysis_results["timestamp"] = self._run_stamp.isoformat()
         
-        # Analyze all mechanisms
-        mechanisms = [
-            self.analyze_system_prompt_injection(),
-            self.analyze_api_response_injection(),
-            self.analyze_tool_result_injection(),
-            self.analyze_context_compaction_injection(),
-            self.analyze_ide_integration_injection()
+        # Collect the report and emit it with a single write
+        out = [
+            "=" * 70,
+            "ANNOUNCEMENT MECHANISM ANALYSIS",
+            "Based on claude-code-reverse decompilation techniques",
+            "=" * 70,
+            "",
         ]
         
+        # Analyze all mechanisms
+        mechanisms = self._run_analyzers()
+        self.analysis_results["mechanisms"] = mechanisms
+        
         # Identify patterns
         patterns = self.identify_announcement_patterns()
         
         # Generate monkey patch template
         patch_template = self.generate_monkey_patch_template()
         
-        # Print results
-        print("\n📋 IDENTIFIED MECHANISMS:")
-        print("-" * 70)
+        # Format results
+        out.append("\n📋 IDENTIFIED MECHANISMS:")
+        out.append("-" * 70)
         for i, mech in enumerate(mechanisms, 1):
-            print(f"\n{i}. {mech['name']} (Likelihood: {mech['likelihood']})")
-            print(f"   Description: {mech['description']}")
-            print(f"   Evidence:")
-            for evidence in mech['evidence']:
-                print(f"   - {evidence}")
-            print(f"   Detection: {mech['detection_method']}")
+            out.append(f"\n{i}. {mech.name} (Likelihood: {mech.likelihood})")
+            out.append(f"   Description: {mech.description}")
+            out.append(f"   Evidence:")
+            out.append("   - " + "\n   - ".join(mech.evidence))
+            out.append(f"   Detection: {mech.detection_method}")
         
-        print("\n\n🔍 ANNOUNCEMENT PATTERNS TO LOOK FOR:")
-        print("-" * 70)
+        out.append("\n\n🔍 ANNOUNCEMENT PATTERNS TO LOOK FOR:")
+        out.append("-" * 70)
         for pattern in patterns:
-            print(f"\n• {pattern['pattern']}")
-            print(f"  Indicator: {pattern['indicator']}")
-            print(f"  Check: {pattern['check']}")
+            out.append(
+                f"\n• {pattern['pattern']}\n"
+                f"  Indicator: {pattern['indicator']}\n"
+                f"  Check: {pattern['check']}"
+            )
+        
+        # The patch is written out once and referenced by path on later runs
+        patch_path = _OUTPUT_DIR / "monkey_patch.js"
+        if not patch_path.exists() or patch_path.read_text() != patch_template:
+            patch_path.write_text(patch_template)
         
-        print("\n\n🔧 MONKEY PATCH TEMPLATE:")
-        print("-" * 70)
-        print(patch_template)
+        out.append("\n\n🔧 MONKEY PATCH TEMPLATE:")
+        out.append("-" * 70)
+        out.append(f"Patch template: {patch_path}")
+        
+        sys.stdout.write("\n".join(out) + "\n")
         
         # Save results
         self.save_analysis()
@@ -299,12 +464,16 @@ function checkForAnnouncements(response) {
     
     def save_analysis(self):
         """Save analysis results to file."""
-        output_dir = Path("analysis_results")
-        output_dir.mkdir(exist_ok=True)
-        
-        output_file = output_dir / f"announcement_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(output_file, 'w') as f:
-            json.dump(self.analysis_results, f, indent=2)
+        output_file = _OUTPUT_DIR / f"announcement_analysis_{self._run_stamp:%Y%m%d_%H%M%S}.json"
+        # Write one top-level section at a time so peak memory tracks the
+        # largest section rather than the whole report
+        last = len(self.analysis_results) - 1
+        with open(output_file, 'wb', buffering=1 << 16) as f:
+            f.write(b'{\n')
+            for i, (key, value) in enumerate(self.analysis_results.items()):
+                f.write(b'  ' + _dumps(key) + b': ' + _dumps(value).replace(b'\n', b'\n  '))
+                f.write(b',\n' if i < last else b'\n')
+            f.write(b'}')
         
         print(f"\n\n💾 Analysis saved to: {output_file}")
 
@@ -314,10 +483,8 @@ def main():
     analyzer = AnnouncementMechanismAnalyzer()
     results = analyzer.run_full_analysis()
     
-    print("\n" + "=" * 70)
-    print("CONCLUSION:")
-    print("=" * 70)
-    print("""
+    sys.stdout.write("\n" + "=" * 70 + "\nCONCLUSION:\n" + "=" * 70 + "\n")
+    sys.stdout.write("""
 Based on the claude-code-reverse decompilation findings, announcements in
 Claude Code are most likely delivered through one or more of these mechanisms:
 
@@ -335,10 +502,11 @@ Claude Code are most likely delivered through one or more of these mechanisms:
    - Added during context compression
    - Would persist across conversation continuations
 
-To verify, implement the monkey-patch template above and monitor:
+To verify, apply analysis_results/monkey_patch.js and monitor:
 - System prompt content changes over time
 - Unexpected content in API responses
 - IDE extension communication channels
+
 """)
 
 
@@ -10,17 +10,59 @@ This script creates a proxy/interceptor that can:
 4. Generate detailed logs for analysis
 """
 
+import array
 import json
 import re
 import hashlib
+import mmap
+import time
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
-from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, fields
+from collections import Counter, defaultdict, deque
 
+# orjson serializes dataclasses natively in C; fall back to the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-@dataclass
+# numpy aggregates the coded indicator columns in C; optional
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# google-re2 scans content for every pattern in one linear-time pass;
+# without it each pattern is searched individually with the stdlib engine
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Hyperscan compiles the same sources into one DFA database; preferred over
+# RE2 when present since a compiled database is shared by every interceptor
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+def _re2_source(pattern: re.Pattern) -> str:
+    """Translate a compiled stdlib pattern into RE2 syntax with inline flags."""
+    flags = ''
+    if pattern.flags & re.IGNORECASE:
+        flags += 'i'
+    if pattern.flags & re.DOTALL:
+        flags += 's'
+    # RE2's \s leaves out \v; spell out the stdlib's ASCII whitespace class
+    source = pattern.pattern.replace(r'\s', r'[\t\n\v\f\r ]')
+    return f'(?{flags}){source}' if flags else source
+
+
+@dataclass(slots=True)
 class APICall:
     """Represents a single API call."""
     timestamp: str
@@ -31,10 +73,11 @@ class APICall:
     messages: List[Dict]
     system_prompt: Optional[str]
     tools: List[str]
-    metadata: Dict[str, Any]
+    # (log path, byte offset, length) of the full record, metadata included
+    log_ref: Optional[Tuple[str, int, int]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AnnouncementIndicator:
     """Represents a detected announcement indicator."""
     timestamp: str
@@ -46,41 +89,330 @@ class AnnouncementIndicator:
     pattern_matched: str
 
 
+# Announcement detection patterns. Every pattern except banner_format is
+# DFA-pure (no backreferences or lazy quantifiers), so the whole set can be
+# compiled into a single RE2 set or hyperscan database. banner_format bounds
+# its delimiter run and inner text so backtracking stays linear in the input.
+# All use ASCII semantics for \b, \s, \d and case folding, which is what
+# RE2 and byte-mode Hyperscan implement, so the engines agree on hits.
+_ANNOUNCEMENT_PATTERNS = {
+    'banner_format': re.compile(
+        r'(\*{3,20}|={3,20}|-{3,20})(.{1,1000}?)\1',
+        re.DOTALL | re.ASCII
+    ),
+    'announcement_keyword': re.compile(
+        r'\b(?:announcement|notice|important|alert|update|news)\b',
+        re.IGNORECASE | re.ASCII
+    ),
+    'date_reference': re.compile(
+        r'\b(?:today|this week|starting|as of|effective)\s{1,4}\d{1,2}[/-]\d{1,2}',
+        re.IGNORECASE | re.ASCII
+    ),
+    'system_message': re.compile(
+        r'\[(?:system|admin|claude)\]',
+        re.IGNORECASE | re.ASCII
+    ),
+    'urgent_marker': re.compile(
+        r'(?:urgent|critical|breaking|immediate)',
+        re.IGNORECASE | re.ASCII
+    ),
+    'version_info': re.compile(
+        r'version\s{1,4}\d+\.\d+',
+        re.IGNORECASE | re.ASCII
+    ),
+}
+_PATTERN_NAMES = list(_ANNOUNCEMENT_PATTERNS)
+
+# Shortest text any pattern can match ('news'); shorter content is not scanned
+_MIN_SCAN_LEN = 4
+
+# How pattern_frequency is tracked: 'bool' patterns count the content blocks
+# they hit and stop at the first match; 'count' patterns add every match.
+# Only keyword patterns, where repetition carries signal, need the full count.
+_PATTERN_MODE = {
+    'banner_format': 'bool',
+    'announcement_keyword': 'count',
+    'date_reference': 'bool',
+    'system_message': 'bool',
+    'urgent_marker': 'count',
+    'version_info': 'bool',
+}
+
+# banner_format's backreference has no DFA form. It is scanned with one
+# DFA-pure superset per delimiter, and hits are confirmed with the exact
+# pattern; a banner needs the same delimiter run on both sides of some text.
+_PREFILTERS = {
+    'banner_format': (r'(?s)\*{3}.+\*{3}', r'(?s)={3}.+={3}', r'(?s)-{3}.+-{3}'),
+}
+
+
+def _scan_sources() -> List[Tuple[int, str]]:
+    """Return (pattern index, DFA-pure source) pairs for the scanner."""
+    sources = []
+    for i, (name, pattern) in enumerate(_ANNOUNCEMENT_PATTERNS.items()):
+        for source in _PREFILTERS.get(name, (_re2_source(pattern),)):
+            sources.append((i, source))
+    return sources
+
+
+def _build_pattern_set() -> Tuple[Any, List[int]]:
+    """
+    Compile all announcement patterns into a single RE2 set.
+    Returns (set, set index -> pattern index).
+    """
+    if re2 is None:
+        return None, []
+    
+    pattern_set = re2.Set.SearchSet()
+    set_ids = []
+    for i, source in _scan_sources():
+        pattern_set.Add(source)
+        set_ids.append(i)
+    pattern_set.Compile()
+    return pattern_set, set_ids
+
+
+def _build_hyperscan_db() -> Tuple[Any, List[int]]:
+    """
+    Compile all announcement patterns into a single Hyperscan block database.
+    Returns (database, expression id -> pattern index).
+    """
+    if hyperscan is None:
+        return None, []
+    
+    sources = _scan_sources()
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[source.encode() for _, source in sources],
+        ids=list(range(len(sources))),
+        elements=len(sources),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(sources),
+    )
+    return db, [i for i, _ in sources]
+
+
+def _on_hs_match(expr_id: int, start: int, end: int, flags: int, hits: set) -> None:
+    hits.add(expr_id)
+
+
+_HS_DB, _HS_IDS = _build_hyperscan_db()
+_PATTERN_SET, _SET_IDS = (None, []) if _HS_DB is not None else _build_pattern_set()
+
+
+def _to_dict(obj: Any) -> Dict[str, Any]:
+    """Flat field mapping for a dataclass, without asdict's recursive copy."""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_to_dict).encode()
+
+
+_INDICATOR_FIELDS = tuple(f.name for f in fields(AnnouncementIndicator))
+
+# confidence and indicator_type come from small fixed alphabets and are
+# stored as one-byte codes into these tuples
+_CONFIDENCE_LEVELS = ('HIGH', 'MEDIUM', 'LOW')
+_INDICATOR_TYPES = (*_PATTERN_NAMES, 'unexpected_message_count')
+_CONFIDENCE_CODES = {level: code for code, level in enumerate(_CONFIDENCE_LEVELS)}
+_INDICATOR_TYPE_CODES = {name: code for code, name in enumerate(_INDICATOR_TYPES)}
+
+
+# Text extractors keyed on the exact content type, so the analyzers dispatch
+# with one dict lookup instead of an isinstance chain
+_REQUEST_EXTRACTORS = {
+    str: lambda content: content,
+}
+_RESPONSE_EXTRACTORS = {
+    dict: (lambda block: block.get('text', ''), 'response_block'),
+    str: (lambda block: block, 'response_content'),
+}
+
+
+def _parse_record(line: bytes) -> Optional[Dict[str, Any]]:
+    """Decode one call log line, or None if it is not a complete record."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _is_record_of(record: Optional[Dict[str, Any]], call: APICall) -> bool:
+    """Whether a logged record is the one written for call."""
+    return (
+        record is not None
+        and record.get('call_id') == call.call_id
+        and record.get('type') == call.type
+        and record.get('timestamp') == call.timestamp
+    )
+
+
+def _find_record(mm: mmap.mmap, call: APICall) -> Optional[Dict[str, Any]]:
+    """Scan a call log for the record written for call."""
+    # Separators differ between orjson and the stdlib encoder, so match the
+    # quoted ID alone and let _is_record_of reject any other occurrence
+    needle = b'"' + call.call_id.encode() + b'"'
+    pos = mm.find(needle)
+    while pos != -1:
+        start = mm.rfind(b'\n', 0, pos) + 1
+        end = mm.find(b'\n', pos)
+        if end == -1:
+            end = len(mm)
+        record = _parse_record(mm[start:end])
+        if _is_record_of(record, call):
+            return record
+        pos = mm.find(needle, end)
+    return None
+
+
+def _group_codes(codes: Any, labels: Tuple[str, ...]) -> Dict[str, List[int]]:
+    """Map each label present in a uint8 code array to its row indices."""
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(labels))
+    groups = {}
+    start = 0
+    for code, n in enumerate(counts.tolist()):
+        if n:
+            groups[labels[code]] = order[start:start + n].tolist()
+        start += n
+    return groups
+
+
 class CallInterceptor:
     """
     Intercepts and analyzes API calls to detect announcement mechanisms.
     Based on the claude-code-reverse methodology.
     """
     
-    def __init__(self, log_dir: str = "interception_logs"):
+    def __init__(
+        self,
+        log_dir: str = "interception_logs",
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        max_calls_in_memory: int = 10_000
+    ):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         
-        self.calls: List[APICall] = []
-        self.indicators: List[AnnouncementIndicator] = []
+        # Calls are appended through one long-lived buffered handle, opened on
+        # the first call of each day and flushed every batch_size records or
+        # flush_interval seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._log_date = None
+        self._log_fh = None
+        self._pending_records = 0
+        self._last_flush = time.monotonic()
+        # Closes the open handle at exit or when the interceptor is collected,
+        # without keeping the interceptor itself alive
+        self._log_finalizer = None
+        
+        # Only recent calls stay in memory; the call log is the durable store
+        # and full records can be read back with load_call()
+        self.calls: deque = deque(maxlen=max_calls_in_memory)
+        self._total_calls = 0
+        # Timeline entries for the most recent calls, maintained as calls arrive
+        self._timeline: deque = deque(maxlen=10)
+        # Indicators are stored column-wise, one list per field, so no object
+        # is allocated per hit and reports group by scanning single columns.
+        # confidence and indicator_type hold byte codes, not strings.
+        self._ind_cols: Dict[str, Any] = {name: [] for name in _INDICATOR_FIELDS}
+        self._ind_cols['confidence'] = array.array('B')
+        self._ind_cols['indicator_type'] = array.array('B')
+        self._indicator_scan: Optional[Tuple[int, Dict, Dict, Counter]] = None
         self.call_patterns = defaultdict(int)
         
-        # Announcement detection patterns
-        self.announcement_patterns = {
-            'banner_format': re.compile(r'(\*{3,}|={3,}|-{3,})\s*(.+?)\s*\1', re.DOTALL),
-            'announcement_keyword': re.compile(r'\b(announcement|notice|important|alert|update|news)\b', re.IGNORECASE),
-            'date_reference': re.compile(r'\b(today|this week|starting|as of|effective)\s+\d{1,2}[/-]\d{1,2}', re.IGNORECASE),
-            'system_message': re.compile(r'\[system\]|\[admin\]|\[claude\]', re.IGNORECASE),
-            'urgent_marker': re.compile(r'(urgent|critical|breaking|immediate)', re.IGNORECASE),
-            'version_info': re.compile(r'version\s+\d+\.\d+', re.IGNORECASE),
-        }
+        # Announcement detection patterns, compiled once per process
+        self.announcement_patterns = _ANNOUNCEMENT_PATTERNS
         
-    def generate_call_id(self, content: str) -> str:
-        """Generate unique ID for a call."""
-        return hashlib.md5(f"{datetime.now().isoformat()}{content}".encode()).hexdigest()[:8]
+    @property
+    def indicators(self) -> List[AnnouncementIndicator]:
+        """Detected indicators, materialized from the indicator columns."""
+        return [
+            AnnouncementIndicator(**self._indicator_record(i))
+            for i in range(len(self._ind_cols['confidence']))
+        ]
+    
+    def _add_indicator(
+        self,
+        timestamp: str,
+        call_id: str,
+        indicator_type: str,
+        content: str,
+        confidence: str,
+        location: str,
+        pattern_matched: str
+    ) -> None:
+        """Append one indicator to the indicator columns."""
+        cols = self._ind_cols
+        cols['timestamp'].append(timestamp)
+        cols['call_id'].append(call_id)
+        cols['indicator_type'].append(_INDICATOR_TYPE_CODES[indicator_type])
+        cols['content'].append(content)
+        cols['confidence'].append(_CONFIDENCE_CODES[confidence])
+        cols['location'].append(location)
+        cols['pattern_matched'].append(pattern_matched)
+    
+    def _indicator_record(self, index: int) -> Dict[str, str]:
+        """Build the report dict for the indicator at index."""
+        record = {name: self._ind_cols[name][index] for name in _INDICATOR_FIELDS}
+        record['indicator_type'] = _INDICATOR_TYPES[record['indicator_type']]
+        record['confidence'] = _CONFIDENCE_LEVELS[record['confidence']]
+        return record
+    
+    def _find_pattern_matches(self, content: str) -> List[Tuple[str, str, int]]:
+        """
+        Return (name, first matched text, frequency increment) for every
+        pattern found in content, in pattern order. Scanner hits are
+        candidates only: each is confirmed with the stdlib pattern, which can
+        reject a hit the scanner accepted.
+        """
+        patterns = self.announcement_patterns
+        if _HS_DB is not None:
+            hits = set()
+            _HS_DB.scan(content.encode(), match_event_handler=_on_hs_match, context=hits)
+            hit_ids = sorted({_HS_IDS[j] for j in hits})
+        elif _PATTERN_SET is not None:
+            hit_ids = sorted({_SET_IDS[j] for j in _PATTERN_SET.Match(content) or ()})
+        else:
+            hit_ids = range(len(_PATTERN_NAMES))
+        
+        found = []
+        for i in hit_ids:
+            name = _PATTERN_NAMES[i]
+            if _PATTERN_MODE[name] == 'count':
+                # One findall gives both the count and, as the groups are
+                # non-capturing, the first matched text
+                matches = patterns[name].findall(content)
+                if matches:
+                    found.append((name, matches[0], len(matches)))
+            else:
+                match = patterns[name].search(content)
+                if match is not None:
+                    found.append((name, match.group(0), 1))
+        return found
+    
+    def generate_call_id(self, content: bytes) -> str:
+        """Generate unique ID for a call from its serialized content."""
+        # Keying with the current time keeps identical payloads distinct
+        return hashlib.blake2b(
+            content, digest_size=4, key=time.time_ns().to_bytes(8, 'little')
+        ).hexdigest()
     
     def intercept_request(self, endpoint: str, params: Dict[str, Any]) -> str:
         """
         Intercept an API request.
         Simulates capturing a request before it's sent.
         """
-        timestamp = datetime.now().isoformat()
-        call_id = self.generate_call_id(json.dumps(params))
+        now = datetime.now()
+        timestamp = now.isoformat()
+        # Serialized once; shared by the call ID and the log record
+        raw_params = _dumps(params)
+        call_id = self.generate_call_id(raw_params)
         
         # Extract key information
         messages = params.get('messages', [])
@@ -97,12 +429,19 @@ class CallInterceptor:
             model=model,
             messages=messages,
             system_prompt=system_prompt,
-            tools=tools,
-            metadata=params
+            tools=tools
         )
         
         self.calls.append(call)
-        self._log_call(call)
+        self._total_calls += 1
+        self._timeline.append({
+            'timestamp': timestamp,
+            'call_id': call_id,
+            'type': call.type,
+            'model': call.model,
+            'endpoint': call.endpoint
+        })
+        self._log_call(call, now, raw_params)
         
         # Analyze for announcements
         self._analyze_request_for_announcements(call)
@@ -114,7 +453,8 @@ class CallInterceptor:
         Intercept an API response.
         Simulates capturing a response before it's processed.
         """
-        timestamp = datetime.now().isoformat()
+        now = datetime.now()
+        timestamp = now.isoformat()
         
         # Extract response content
         content = response.get('content', [])
@@ -128,12 +468,19 @@ class CallInterceptor:
             model=response.get('model', 'unknown'),
             messages=messages,
             system_prompt=None,
-            tools=[],
-            metadata=response
+            tools=[]
         )
         
         self.calls.append(call)
-        self._log_call(call)
+        self._total_calls += 1
+        self._timeline.append({
+            'timestamp': timestamp,
+            'call_id': call_id,
+            'type': call.type,
+            'model': call.model,
+            'endpoint': call.endpoint
+        })
+        self._log_call(call, now, _dumps(response))
         
         # Analyze for announcements
         self._analyze_response_for_announcements(call)
@@ -151,20 +498,19 @@ class CallInterceptor:
             )
         
         # Check messages
+        check = self._check_content_for_patterns
         for i, message in enumerate(call.messages):
             content = message.get('content', '')
-            if isinstance(content, str):
-                self._check_content_for_patterns(
-                    call.call_id,
-                    content,
-                    f'message_{i}',
-                    call.timestamp
-                )
+            extract = _REQUEST_EXTRACTORS.get(type(content))
+            if extract is not None:
+                text = extract(content)
+                if text:
+                    check(call.call_id, text, f'message_{i}', call.timestamp)
         
         # Check for unexpected message types
         user_message_count = sum(1 for m in call.messages if m.get('role') == 'user')
         if user_message_count > 1:
-            indicator = AnnouncementIndicator(
+            self._add_indicator(
                 timestamp=call.timestamp,
                 call_id=call.call_id,
                 indicator_type='unexpected_message_count',
@@ -173,28 +519,18 @@ class CallInterceptor:
                 location='message_list',
                 pattern_matched='multiple_user_messages'
             )
-            self.indicators.append(indicator)
     
     def _analyze_response_for_announcements(self, call: APICall) -> None:
         """Analyze response for announcement indicators."""
         
+        check = self._check_content_for_patterns
         for i, content_block in enumerate(call.messages):
-            if isinstance(content_block, dict):
-                text = content_block.get('text', '')
+            handler = _RESPONSE_EXTRACTORS.get(type(content_block))
+            if handler is not None:
+                extract, location = handler
+                text = extract(content_block)
                 if text:
-                    self._check_content_for_patterns(
-                        call.call_id,
-                        text,
-                        f'response_block_{i}',
-                        call.timestamp
-                    )
-            elif isinstance(content_block, str):
-                self._check_content_for_patterns(
-                    call.call_id,
-                    content_block,
-                    f'response_content_{i}',
-                    call.timestamp
-                )
+                    check(call.call_id, text, f'{location}_{i}', call.timestamp)
     
     def _check_content_for_patterns(
         self,
@@ -204,40 +540,40 @@ class CallInterceptor:
         timestamp: str
     ) -> None:
         """Check content against announcement patterns."""
-        
-        for pattern_name, pattern in self.announcement_patterns.items():
-            matches = pattern.findall(content)
-            if matches:
-                # Determine confidence based on pattern type
-                confidence = self._determine_confidence(pattern_name, matches, content)
-                
-                indicator = AnnouncementIndicator(
-                    timestamp=timestamp,
-                    call_id=call_id,
-                    indicator_type=pattern_name,
-                    content=str(matches)[:200],  # Truncate long matches
-                    confidence=confidence,
-                    location=location,
-                    pattern_matched=pattern_name
-                )
-                self.indicators.append(indicator)
-                
-                # Track pattern frequency
-                self.call_patterns[pattern_name] += 1
+        if len(content) < _MIN_SCAN_LEN:
+            return
+        
+        found = self._find_pattern_matches(content)
+        total_matching = len(found)
+        
+        # Bind hot-loop lookups to locals once per content block
+        call_patterns = self.call_patterns
+        add_indicator = self._add_indicator
+        determine_confidence = self._determine_confidence
+        
+        for pattern_name, preview, frequency in found:
+            add_indicator(
+                timestamp=timestamp,
+                call_id=call_id,
+                indicator_type=pattern_name,
+                content=preview[:200],  # Truncate long matches
+                confidence=determine_confidence(pattern_name, total_matching),
+                location=location,
+                pattern_matched=pattern_name
+            )
+            # Track pattern frequency: content blocks hit, or total matches
+            call_patterns[pattern_name] += frequency
     
-    def _determine_confidence(self, pattern_name: str, matches: Any, content: str) -> str:
-        """Determine confidence level for detected pattern."""
+    def _determine_confidence(self, pattern_name: str, matching_patterns: int) -> str:
+        """
+        Determine confidence level for detected pattern, given how many
+        patterns matched the same content.
+        """
         
         # High confidence patterns
         if pattern_name in ['banner_format', 'system_message']:
             return 'HIGH'
         
-        # Check if multiple patterns match
-        matching_patterns = sum(
-            1 for p in self.announcement_patterns.values()
-            if p.search(content)
-        )
-        
         if matching_patterns >= 3:
             return 'HIGH'
         elif matching_patterns == 2:
@@ -245,65 +581,201 @@ class CallInterceptor:
         else:
             return 'LOW'
     
-    def _log_call(self, call: APICall) -> None:
-        """Log call to file."""
-        log_file = self.log_dir / f"calls_{datetime.now().strftime('%Y%m%d')}.jsonl"
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(asdict(call)) + '\n')
+    def _open_log(self, now: datetime) -> None:
+        """Switch the call log to the daily file for now's date."""
+        if self._log_fh is not None:
+            self.close()
+        self._log_date = now.date()
+        log_file = self.log_dir / f"calls_{now.strftime('%Y%m%d')}.jsonl"
+        self._log_fh = open(log_file, 'ab', buffering=1 << 20)
+        self._log_finalizer = weakref.finalize(self, self._log_fh.close)
+    
+    def _log_call(self, call: APICall, now: datetime, metadata: bytes) -> None:
+        """
+        Log call to file. metadata is the already-serialized request/response
+        and is spliced into the record rather than encoded again.
+        """
+        if now.date() != self._log_date:
+            self._open_log(now)
+        record = _to_dict(call)
+        del record['log_ref']
+        line = _dumps(record)[:-1] + b',"metadata":' + metadata + b'}\n'
+        offset = self._log_fh.tell()
+        self._log_fh.write(line)
+        call.log_ref = (self._log_fh.name, offset, len(line))
+        self._pending_records += 1
+        if (
+            self._pending_records >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush_logs()
+    
+    def load_call(self, call_id: str) -> List[Dict[str, Any]]:
+        """
+        Read back the full logged records, metadata included, for a call
+        that is still held in memory.
+        """
+        self.flush_logs()
+        records = []
+        for call in self.calls:
+            if call.call_id != call_id or call.log_ref is None:
+                continue
+            path, offset, length = call.log_ref
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                record = _parse_record(mm[offset:offset + length])
+                if not _is_record_of(record, call):
+                    # Another handle appended to the same daily file, so the
+                    # offset from tell() is stale; find the record by call_id
+                    record = _find_record(mm, call)
+            if record is not None:
+                records.append(record)
+        return records
+    
+    def flush_logs(self) -> None:
+        """Write any buffered call records to disk."""
+        if self._log_fh is not None and not self._log_fh.closed:
+            self._log_fh.flush()
+        self._pending_records = 0
+        self._last_flush = time.monotonic()
+    
+    def close(self) -> None:
+        """Flush and close the call log."""
+        if self._log_fh is not None and not self._log_fh.closed:
+            self.flush_logs()
+            self._log_finalizer()
+        # The next logged call reopens the daily file
+        self._log_fh = None
+        self._log_date = None
+        self._log_finalizer = None
     
     def generate_report(self) -> Dict[str, Any]:
         """Generate comprehensive analysis report."""
         
+        summary = self._report_summary()
         report = {
+            'timestamp': summary['timestamp'],
+            'summary': summary['summary'],
+            'indicators_by_confidence': self._group_indicators_by_confidence(),
+            'indicators_by_type': self._group_indicators_by_type(),
+            'pattern_frequency': summary['pattern_frequency'],
+            'timeline': summary['timeline'],
+            'recommendations': summary['recommendations']
+        }
+        
+        return report
+    
+    def _report_summary(self) -> Dict[str, Any]:
+        """Report sections other than the per-indicator groupings."""
+        return {
             'timestamp': datetime.now().isoformat(),
             'summary': {
-                'total_calls': len(self.calls),
-                'total_indicators': len(self.indicators),
-                'high_confidence_indicators': sum(1 for i in self.indicators if i.confidence == 'HIGH'),
+                'total_calls': self._total_calls,
+                'total_indicators': len(self._ind_cols['confidence']),
+                'high_confidence_indicators': self._scan_indicators()[2]['HIGH'],
                 'unique_patterns': len(self.call_patterns)
             },
-            'indicators_by_confidence': self._group_indicators_by_confidence(),
-            'indicators_by_type': self._group_indicators_by_type(),
             'pattern_frequency': dict(self.call_patterns),
             'timeline': self._build_timeline(),
             'recommendations': self._generate_recommendations()
         }
-        
-        return report
+    
+    def _write_report(self, report_file: Path, summary: Dict[str, Any]) -> None:
+        """
+        Write the full report, streaming indicator records straight from the
+        indicator columns instead of building the grouped dicts in memory.
+        """
+        by_confidence, by_type, _ = self._scan_indicators()
+        sections = (
+            ('timestamp', summary['timestamp']),
+            ('summary', summary['summary']),
+            ('indicators_by_confidence', by_confidence),
+            ('indicators_by_type', by_type),
+            ('pattern_frequency', summary['pattern_frequency']),
+            ('timeline', summary['timeline']),
+            ('recommendations', summary['recommendations'])
+        )
+        with open(report_file, 'wb', buffering=1 << 16) as f:
+            f.write(b'{')
+            for n, (key, value) in enumerate(sections):
+                f.write(b',\n  "' if n else b'\n  "')
+                f.write(key.encode() + b'": ')
+                if value is by_confidence or value is by_type:
+                    self._write_indicator_groups(f, value)
+                else:
+                    f.write(_dumps(value))
+            f.write(b'\n}\n')
+    
+    def _write_indicator_groups(self, f: Any, groups: Dict[str, List[int]]) -> None:
+        """Write {group: [record, ...]} one indicator record at a time."""
+        f.write(b'{')
+        for n, (group, indices) in enumerate(groups.items()):
+            f.write(b',\n    ' if n else b'\n    ')
+            f.write(_dumps(group) + b': [')
+            for m, i in enumerate(indices):
+                f.write(b',\n      ' if m else b'\n      ')
+                f.write(_dumps(self._indicator_record(i)))
+            f.write(b'\n    ]' if indices else b']')
+        f.write(b'\n  }' if groups else b'}')
+    
+    def _scan_indicators(self) -> Tuple[Dict[str, List[int]], Dict[str, List[int]], Counter]:
+        """
+        Group indicator indices by confidence and by type and count
+        confidence levels in one pass over the coded columns. Groups are
+        ordered by code. The result is cached until new indicators arrive.
+        """
+        confidence_col = self._ind_cols['confidence']
+        type_col = self._ind_cols['indicator_type']
+        count = len(confidence_col)
+        if self._indicator_scan is None or self._indicator_scan[0] != count:
+            if np is not None:
+                by_confidence = _group_codes(
+                    np.frombuffer(confidence_col, dtype=np.uint8), _CONFIDENCE_LEVELS
+                )
+                by_type = _group_codes(np.frombuffer(type_col, dtype=np.uint8), _INDICATOR_TYPES)
+            else:
+                confidence_groups = [[] for _ in _CONFIDENCE_LEVELS]
+                type_groups = [[] for _ in _INDICATOR_TYPES]
+                for i, (confidence, indicator_type) in enumerate(zip(confidence_col, type_col)):
+                    confidence_groups[confidence].append(i)
+                    type_groups[indicator_type].append(i)
+                by_confidence = {
+                    level: group
+                    for level, group in zip(_CONFIDENCE_LEVELS, confidence_groups)
+                    if group
+                }
+                by_type = {
+                    name: group for name, group in zip(_INDICATOR_TYPES, type_groups) if group
+                }
+            confidence_counts = Counter(
+                {level: len(group) for level, group in by_confidence.items()}
+            )
+            self._indicator_scan = (count, by_confidence, by_type, confidence_counts)
+        return self._indicator_scan[1:]
     
     def _group_indicators_by_confidence(self) -> Dict[str, List[Dict]]:
         """Group indicators by confidence level."""
-        grouped = defaultdict(list)
-        for indicator in self.indicators:
-            grouped[indicator.confidence].append(asdict(indicator))
-        return dict(grouped)
+        return {
+            confidence: [self._indicator_record(i) for i in indices]
+            for confidence, indices in self._scan_indicators()[0].items()
+        }
     
     def _group_indicators_by_type(self) -> Dict[str, List[Dict]]:
         """Group indicators by type."""
-        grouped = defaultdict(list)
-        for indicator in self.indicators:
-            grouped[indicator.indicator_type].append(asdict(indicator))
-        return dict(grouped)
+        return {
+            indicator_type: [self._indicator_record(i) for i in indices]
+            for indicator_type, indices in self._scan_indicators()[1].items()
+        }
     
     def _build_timeline(self) -> List[Dict[str, Any]]:
-        """Build timeline of events."""
-        timeline = []
-        for call in self.calls[-10:]:  # Last 10 calls
-            timeline.append({
-                'timestamp': call.timestamp,
-                'call_id': call.call_id,
-                'type': call.type,
-                'model': call.model,
-                'endpoint': call.endpoint
-            })
-        return timeline
+        """Build timeline of the last 10 calls."""
+        return list(self._timeline)
     
     def _generate_recommendations(self) -> List[str]:
         """Generate recommendations based on analysis."""
         recommendations = []
         
         # Check for high confidence indicators
-        high_conf = sum(1 for i in self.indicators if i.confidence == 'HIGH')
+        high_conf = self._scan_indicators()[2]['HIGH']
         if high_conf > 0:
             recommendations.append(
                 f"Found {high_conf} high-confidence announcement indicators. "
@@ -341,7 +813,9 @@ class CallInterceptor:
     
     def print_report(self) -> None:
         """Print formatted report."""
-        report = self.generate_report()
+        report = self._report_summary()
+        by_confidence = self._scan_indicators()[0]
+        cols = self._ind_cols
         
         print("\n" + "=" * 70)
         print("CALL INTERCEPTION ANALYSIS REPORT")
@@ -355,10 +829,11 @@ class CallInterceptor:
         print("\n\n🔍 INDICATORS BY CONFIDENCE:")
         print("-" * 70)
         for confidence in ['HIGH', 'MEDIUM', 'LOW']:
-            indicators = report['indicators_by_confidence'].get(confidence, [])
-            print(f"\n{confidence}: {len(indicators)} indicators")
-            for ind in indicators[:3]:  # Show first 3
-                print(f"  • {ind['indicator_type']}: {ind['content'][:50]}...")
+            indices = by_confidence.get(confidence, [])
+            print(f"\n{confidence}: {len(indices)} indicators")
+            for i in indices[:3]:  # Show first 3
+                indicator_type = _INDICATOR_TYPES[cols['indicator_type'][i]]
+                print(f"  • {indicator_type}: {cols['content'][i][:50]}...")
         
         print("\n\n📈 PATTERN FREQUENCY:")
         print("-" * 70)
@@ -367,7 +842,9 @@ class CallInterceptor:
             key=lambda x: x[1],
             reverse=True
         ):
-            print(f"{pattern.replace('_', ' ').title()}: {count}")
+            # 'count' patterns report total matches, the rest content blocks hit
+            unit = 'matches' if _PATTERN_MODE.get(pattern) == 'count' else 'content blocks'
+            print(f"{pattern.replace('_', ' ').title()}: {count} ({unit})")
         
         print("\n\n💡 RECOMMENDATIONS:")
         print("-" * 70)
@@ -376,8 +853,7 @@ class CallInterceptor:
         
         # Save report
         report_file = self.log_dir / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        self._write_report(report_file, report)
         print(f"\n\n💾 Full report saved to: {report_file}")
 
 